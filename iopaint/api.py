@@ -1,5 +1,6 @@
 import asyncio
 import os
+import shutil
 import threading
 import time
 import traceback
@@ -7,7 +8,6 @@ from pathlib import Path
 from typing import Optional, Dict, List
 
 import cv2
-import numpy as np
 import socketio
 import torch
 
@@ -21,12 +21,11 @@ except:
 
 
 import uvicorn
-from PIL import Image
 from fastapi import APIRouter, FastAPI, Request, UploadFile
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, Response
+from fastapi.responses import JSONResponse, FileResponse, Response, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 from socketio import AsyncServer
@@ -35,11 +34,12 @@ from iopaint.file_manager import FileManager
 from iopaint.helper import (
     load_img,
     decode_base64_to_image,
-    pil_to_bytes,
     numpy_to_bytes,
+    bgr_np_img_to_bytes,
     concat_alpha_channel,
     gen_frontend_mask,
     adjust_mask,
+    binarize_mask,
 )
 from iopaint.model.utils import torch_gc
 from iopaint.model_manager import ModelManager
@@ -159,9 +159,9 @@ class Api:
 
         # fmt: off
         self.add_api_route("/api/v1/gen-info", self.api_geninfo, methods=["POST"], response_model=GenInfoResponse)
-        self.add_api_route("/api/v1/server-config", self.api_server_config, methods=["GET"], response_model=ServerConfigResponse)
-        self.add_api_route("/api/v1/model", self.api_current_model, methods=["GET"], response_model=ModelInfo)
-        self.add_api_route("/api/v1/model", self.api_switch_model, methods=["POST"], response_model=ModelInfo)
+        self.add_api_route("/api/v1/server-config", self.api_server_config, methods=["GET"], response_model=ServerConfigResponse, response_class=ORJSONResponse)
+        self.add_api_route("/api/v1/model", self.api_current_model, methods=["GET"], response_model=ModelInfo, response_class=ORJSONResponse)
+        self.add_api_route("/api/v1/model", self.api_switch_model, methods=["POST"], response_model=ModelInfo, response_class=ORJSONResponse)
         self.add_api_route("/api/v1/inputimage", self.api_input_image, methods=["GET"])
         self.add_api_route("/api/v1/inpaint", self.api_inpaint, methods=["POST"])
         self.add_api_route("/api/v1/switch_plugin_model", self.api_switch_plugin_model, methods=["POST"])
@@ -184,9 +184,9 @@ class Api:
 
     def api_save_image(self, file: UploadFile):
         filename = file.filename
-        origin_image_bytes = file.file.read()
+        # stream the uploaded file to disk, avoid loading the whole image into memory
         with open(self.config.output_dir / filename, "wb") as fw:
-            fw.write(origin_image_bytes)
+            shutil.copyfileobj(file.file, fw)
 
     def api_current_model(self) -> ModelInfo:
         return self.model_manager.current_model
@@ -194,12 +194,14 @@ class Api:
     def api_switch_model(self, req: SwitchModelRequest) -> ModelInfo:
         if req.name == self.model_manager.name:
             return self.model_manager.current_model
-        self.model_manager.switch(req.name)
+        with self.queue_lock:
+            self.model_manager.switch(req.name)
         return self.model_manager.current_model
 
     def api_switch_plugin_model(self, req: SwitchPluginModelRequest):
         if req.plugin_name in self.plugins:
-            self.plugins[req.plugin_name].switch_model(req.model_name)
+            with self.queue_lock:
+                self.plugins[req.plugin_name].switch_model(req.model_name)
             if req.plugin_name == RemoveBG.name:
                 self.config.remove_bg_model = req.model_name
             if req.plugin_name == RealESRGANUpscaler.name:
@@ -252,10 +254,10 @@ class Api:
         return GenInfoResponse(prompt=prompt, negative_prompt=negative_prompt)
 
     def api_inpaint(self, req: InpaintRequest):
-        image, alpha_channel, infos = decode_base64_to_image(req.image)
+        image, alpha_channel, infos = decode_base64_to_image(req.image, cache=True)
         mask, _, _ = decode_base64_to_image(req.mask, gray=True)
 
-        mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)[1]
+        mask = binarize_mask(mask)
         if image.shape[:2] != mask.shape[:2]:
             raise HTTPException(
                 400,
@@ -264,20 +266,22 @@ class Api:
 
         if req.paint_by_example_example_image:
             paint_by_example_image, _, _ = decode_base64_to_image(
-                req.paint_by_example_example_image
+                req.paint_by_example_example_image, cache=True
             )
 
-        start = time.time()
-        rgb_np_img = self.model_manager(image, mask, req)
-        logger.info(f"process time: {(time.time() - start) * 1000:.2f}ms")
-        torch_gc()
+        # model is the serialization point, image decode/encode can still run concurrently
+        with self.queue_lock:
+            start = time.time()
+            bgr_np_img = self.model_manager(image, mask, req)
+            logger.info(f"process time: {(time.time() - start) * 1000:.2f}ms")
+            torch_gc()
 
-        rgb_np_img = cv2.cvtColor(rgb_np_img.astype(np.uint8), cv2.COLOR_BGR2RGB)
-        rgb_res = concat_alpha_channel(rgb_np_img, alpha_channel)
+        # model_manager already returns uint8, cv2.imencode takes BGR image directly
+        bgr_res = concat_alpha_channel(bgr_np_img, alpha_channel)
 
         ext = "png"
-        res_img_bytes = pil_to_bytes(
-            Image.fromarray(rgb_res),
+        res_img_bytes = bgr_np_img_to_bytes(
+            bgr_res,
             ext=ext,
             quality=self.config.quality,
             infos=infos,
@@ -299,19 +303,21 @@ class Api:
             raise HTTPException(
                 status_code=422, detail="Plugin does not support output image"
             )
-        rgb_np_img, alpha_channel, infos = decode_base64_to_image(req.image)
-        bgr_or_rgba_np_img = self.plugins[req.name].gen_image(rgb_np_img, req)
-        torch_gc()
+        rgb_np_img, alpha_channel, infos = decode_base64_to_image(
+            req.image, cache=True
+        )
+        with self.queue_lock, torch.inference_mode():
+            bgr_or_rgba_np_img = self.plugins[req.name].gen_image(rgb_np_img, req)
+            torch_gc()
 
         if bgr_or_rgba_np_img.shape[2] == 4:
-            rgba_np_img = bgr_or_rgba_np_img
+            bgra_np_img = cv2.cvtColor(bgr_or_rgba_np_img, cv2.COLOR_RGBA2BGRA)
         else:
-            rgba_np_img = cv2.cvtColor(bgr_or_rgba_np_img, cv2.COLOR_BGR2RGB)
-            rgba_np_img = concat_alpha_channel(rgba_np_img, alpha_channel)
+            bgra_np_img = concat_alpha_channel(bgr_or_rgba_np_img, alpha_channel)
 
         return Response(
-            content=pil_to_bytes(
-                Image.fromarray(rgba_np_img),
+            content=bgr_np_img_to_bytes(
+                bgra_np_img,
                 ext=ext,
                 quality=self.config.quality,
                 infos=infos,
@@ -326,9 +332,12 @@ class Api:
             raise HTTPException(
                 status_code=422, detail="Plugin does not support output image"
             )
-        rgb_np_img, alpha_channel, infos = decode_base64_to_image(req.image)
-        bgr_or_gray_mask = self.plugins[req.name].gen_mask(rgb_np_img, req)
-        torch_gc()
+        rgb_np_img, alpha_channel, infos = decode_base64_to_image(
+            req.image, cache=True
+        )
+        with self.queue_lock, torch.inference_mode():
+            bgr_or_gray_mask = self.plugins[req.name].gen_mask(rgb_np_img, req)
+            torch_gc()
         res_mask = gen_frontend_mask(bgr_or_gray_mask)
         return Response(
             content=numpy_to_bytes(res_mask, "png"),
@@ -350,6 +359,8 @@ class Api:
             host=self.config.host,
             port=self.config.port,
             timeout_keep_alive=999999999,
+            # startup message "Uvicorn running on http://..." is logged by uvicorn.error, not affected
+            access_log=False,
         )
 
     def _build_file_manager(self) -> Optional[FileManager]:
@@ -389,6 +400,8 @@ class Api:
             device=torch.device(self.config.device),
             no_half=self.config.no_half,
             low_mem=self.config.low_mem,
+            torch_compile=self.config.torch_compile,
+            cuda_graph=self.config.cuda_graph,
             disable_nsfw=self.config.disable_nsfw_checker,
             sd_cpu_textencoder=self.config.cpu_textencoder,
             local_files_only=self.config.local_files_only,
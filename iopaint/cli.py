@@ -114,6 +114,8 @@ def start(
     ),
     low_mem: bool = Option(False, help=LOW_MEM_HELP),
     no_half: bool = Option(False, help=NO_HALF_HELP),
+    torch_compile: bool = Option(False, help=TORCH_COMPILE_HELP),
+    cuda_graph: bool = Option(False, help=CUDA_GRAPH_HELP),
     cpu_offload: bool = Option(False, help=CPU_OFFLOAD_HELP),
     disable_nsfw_checker: bool = Option(False, help=DISABLE_NSFW_HELP),
     cpu_textencoder: bool = Option(False, help=CPU_TEXTENCODER_HELP),
@@ -142,6 +144,13 @@ def start(
 ):
     dump_environment_info()
     device = check_device(device)
+    if device == Device.cuda:
+        import torch
+
+        # TF32 tensor cores on Ampere+, cuDNN picks the fastest conv algorithm per input shape
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
     if input and not input.exists():
         logger.error(f"invalid --input: {input} not exists")
         exit(-1)
@@ -186,6 +195,8 @@ def start(
         model=model,
         no_half=no_half,
         low_mem=low_mem,
+        torch_compile=torch_compile,
+        cuda_graph=cuda_graph,
         cpu_offload=cpu_offload,
         disable_nsfw_checker=disable_nsfw_checker,
         local_files_only=local_files_only,
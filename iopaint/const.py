@@ -22,6 +22,21 @@ MPS_UNSUPPORT_MODELS = [
     "manga",
 ]
 
+# These models use torch.fft(cuFFT only supports power of 2 sizes in half precision)
+# or handle fp16 by themselves, so do not run them under fp16 autocast
+AUTOCAST_UNSUPPORT_MODELS = [
+    "lama",
+    "lama_manga",
+    "zits",
+    "mat",
+    "fcf",
+    "cv2",
+]
+
+# These models call self.model(*tensors) in forward, other models pass kwargs or call
+# submodules(e.g: ldm apply_model) which always fallback to eager mode
+CUDA_GRAPH_SUPPORT_MODELS = ["lama", "migan"]
+
 DEFAULT_MODEL = "lama"
 AVAILABLE_MODELS = ["lama", "ldm", "zits", "mat", "fcf", "manga", "cv2", "migan"]
 DIFFUSION_MODELS = [
@@ -46,6 +61,16 @@ Offloads diffusion model's weight to CPU RAM, significantly reducing vRAM usage.
 
 LOW_MEM_HELP = "Enable attention slicing and vae tiling to save memory."
 
+TORCH_COMPILE_HELP = """
+Compile model with torch.compile(mode="reduce-overhead") to speed up inference, only works on cuda.
+The first inference of each new image size will be slow because of compilation.
+"""
+
+CUDA_GRAPH_HELP = """
+Capture erase model(e.g. lama) forward into CUDA graph to reduce kernel launch overhead, only works on cuda.
+Graphs of the last 4 input sizes are cached, the first inference of each new image size will be slow.
+"""
+
 DISABLE_NSFW_HELP = """
 Disable NSFW checker for diffusion model.
 """
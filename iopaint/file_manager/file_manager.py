@@ -4,8 +4,9 @@ from pathlib import Path
 from typing import List
 
 from PIL import Image, ImageOps, PngImagePlugin
-from fastapi import FastAPI, UploadFile, HTTPException
-from starlette.responses import FileResponse
+from fastapi import FastAPI, UploadFile, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from starlette.responses import FileResponse, Response
 
 from ..schema import MediasResponse, MediaTab
 
@@ -27,7 +28,7 @@ class FileManager:
             self.thumbnail_directory.mkdir(parents=True)
 
         # fmt: off
-        self.app.add_api_route("/api/v1/medias", self.api_medias, methods=["GET"], response_model=List[MediasResponse])
+        self.app.add_api_route("/api/v1/medias", self.api_medias, methods=["GET"], response_model=List[MediasResponse], response_class=ORJSONResponse)
         self.app.add_api_route("/api/v1/media_file", self.api_media_file, methods=["GET"])
         self.app.add_api_route("/api/v1/media_thumbnail_file", self.api_media_thumbnail_file, methods=["GET"])
         # fmt: on
@@ -36,26 +37,53 @@ class FileManager:
         img_dir = self._get_dir(tab)
         return self._media_names(img_dir)
 
-    def api_media_file(self, tab: MediaTab, filename: str) -> FileResponse:
+    def api_media_file(
+        self, request: Request, tab: MediaTab, filename: str
+    ) -> Response:
         file_path = self._get_file(tab, filename)
-        return FileResponse(file_path, media_type="image/png")
+        return self._conditional_file_response(
+            request, file_path, media_type="image/png"
+        )
 
     # tab=${tab}?filename=${filename.name}?width=${width}&height=${height}
     def api_media_thumbnail_file(
-        self, tab: MediaTab, filename: str, width: int, height: int
-    ) -> FileResponse:
+        self, request: Request, tab: MediaTab, filename: str, width: int, height: int
+    ) -> Response:
         img_dir = self._get_dir(tab)
         thumb_filename, (width, height) = self.get_thumbnail(
             img_dir, filename, width=width, height=height
         )
         thumbnail_filepath = self.thumbnail_directory / thumb_filename
-        return FileResponse(
+        return self._conditional_file_response(
+            request,
             thumbnail_filepath,
             headers={
                 "X-Width": str(width),
                 "X-Height": str(height),
             },
             media_type="image/jpeg",
+            max_age=86400,
+        )
+
+    @staticmethod
+    def _conditional_file_response(
+        request: Request, file_path, media_type: str, headers=None, max_age: int = 0
+    ) -> Response:
+        # Return 304 if the file not changed, browser will use its cached file
+        stat_result = os.stat(file_path)
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        headers = {
+            **(headers or {}),
+            "ETag": etag,
+            "Cache-Control": f"max-age={max_age}" if max_age else "no-cache",
+        }
+        if_none_match = [
+            it.strip() for it in request.headers.get("if-none-match", "").split(",")
+        ]
+        if etag in if_none_match or f"W/{etag}" in if_none_match:
+            return Response(status_code=304, headers=headers)
+        return FileResponse(
+            file_path, headers=headers, media_type=media_type, stat_result=stat_result
         )
 
     def _get_dir(self, tab: MediaTab) -> Path:
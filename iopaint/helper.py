@@ -1,8 +1,9 @@
 import base64
-import imghdr
 import io
 import os
 import sys
+import threading
+from collections import OrderedDict
 from typing import List, Optional, Dict, Tuple
 
 from urllib.parse import urlparse
@@ -155,18 +156,77 @@ def pil_to_bytes(pil_img, ext: str, quality: int = 95, infos={}) -> bytes:
     return image_bytes
 
 
-def load_img(img_bytes, gray: bool = False, return_info: bool = False):
-    alpha_channel = None
-    image = Image.open(io.BytesIO(img_bytes))
+# Image infos which cv2.imencode can't write, fallback to PIL to preserve them
+PIL_ONLY_INFOS = ["exif", "icc_profile", "parameters", "dpi", "transparency"]
 
-    if return_info:
-        infos = image.info
 
-    try:
-        image = ImageOps.exif_transpose(image)
-    except:
-        pass
+def bgr_np_img_to_bytes(
+    bgr_np_img: np.ndarray, ext: str, quality: int = 95, infos={}
+) -> bytes:
+    """
+    Encode BGR/BGRA image with OpenCV, it's much faster than PIL.
+    Only use PIL when infos(e.g: exif) need to be saved into the result image.
+    """
+    if any(infos.get(k) is not None for k in PIL_ONLY_INFOS):
+        if bgr_np_img.ndim == 3 and bgr_np_img.shape[2] == 4:
+            rgb_np_img = cv2.cvtColor(bgr_np_img, cv2.COLOR_BGRA2RGBA)
+        else:
+            rgb_np_img = cv2.cvtColor(bgr_np_img, cv2.COLOR_BGR2RGB)
+        return pil_to_bytes(
+            Image.fromarray(rgb_np_img), ext=ext, quality=quality, infos=infos
+        )
+
+    if ext == "jpeg":
+        ext = "jpg"
+    if ext == "jpg":
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+    elif ext == "png":
+        # lower compression level is much faster, and the file size is still acceptable
+        params = [int(cv2.IMWRITE_PNG_COMPRESSION), 1]
+    else:
+        params = []
+    return cv2.imencode(f".{ext}", bgr_np_img, params)[1].tobytes()
+
 
+def cv2_decode_img(
+    img_bytes: bytes, image: Image.Image, gray: bool = False
+) -> Optional[np.ndarray]:
+    """
+    Decode image with OpenCV(libjpeg-turbo/libpng), it's much faster than PIL.
+
+    Args:
+        img_bytes: encoded image bytes
+        image: PIL image opened from img_bytes, only header is parsed before load()
+        gray: decode image as gray
+
+    Returns:
+        RGB or gray np image, None if image has alpha channel, needs exif rotate or
+        needs RGB to gray conversion, these images should be decoded by PIL
+    """
+    if image.format not in ["JPEG", "PNG", "WEBP"]:
+        return None
+    # libpng's RGB to gray conversion is gamma aware(sRGB/gAMA chunk),
+    # result is different from PIL convert("L")
+    if image.mode not in (["L"] if gray else ["L", "RGB"]):
+        return None
+    if "exif" in image.info:
+        try:
+            if image.getexif().get(0x0112, 1) != 1:
+                return None
+        except:
+            return None
+
+    flags = cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR
+    np_img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), flags)
+    if np_img is None:
+        return None
+    if not gray:
+        np_img = cv2.cvtColor(np_img, cv2.COLOR_BGR2RGB)
+    return np_img
+
+
+def pil_decode_img(image: Image.Image, gray: bool = False):
+    alpha_channel = None
     if gray:
         image = image.convert("L")
         np_img = np.array(image)
@@ -178,6 +238,23 @@ def load_img(img_bytes, gray: bool = False, return_info: bool = False):
         else:
             image = image.convert("RGB")
             np_img = np.array(image)
+    return np_img, alpha_channel
+
+
+def load_img(img_bytes, gray: bool = False, return_info: bool = False):
+    alpha_channel = None
+    image = Image.open(io.BytesIO(img_bytes))
+
+    if return_info:
+        infos = image.info
+
+    np_img = cv2_decode_img(img_bytes, image, gray)
+    if np_img is None:
+        try:
+            image = ImageOps.exif_transpose(image)
+        except:
+            pass
+        np_img, alpha_channel = pil_decode_img(image, gray)
 
     if return_info:
         return np_img, alpha_channel, infos
@@ -193,9 +270,10 @@ def norm_img(np_img):
 
 
 def resize_max_size(
-    np_img, size_limit: int, interpolation=cv2.INTER_CUBIC
+    np_img, size_limit: int, interpolation=cv2.INTER_AREA
 ) -> np.ndarray:
     # Resize image's longer size to size_limit if longer size larger than size_limit
+    # Only downscale here: INTER_AREA is faster and sharper than INTER_CUBIC, masks should use INTER_NEAREST
     h, w = np_img.shape[:2]
     if max(h, w) > size_limit:
         ratio = size_limit / max(h, w)
@@ -298,22 +376,92 @@ def is_mac():
 
 
 def get_image_ext(img_bytes):
-    w = imghdr.what("", img_bytes)
-    if w is None:
-        w = "jpeg"
-    return w
+    # check magic bytes directly, imghdr is deprecated since python 3.11
+    head = img_bytes[:12]
+    if head.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head.startswith(b"BM"):
+        return "bmp"
+    return "jpeg"
+
+
+# Same image is usually sent many times in a session(inpaint/plugins),
+# cache the decoded results by md5 of the base64 string to avoid decoding again.
+DECODE_CACHE_MAX_ITEMS = 8
+DECODE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_decode_cache: "OrderedDict[Tuple[str, bool], Tuple]" = OrderedDict()
+_decode_cache_lock = threading.Lock()
+
+
+def _copy_decode_result(res: Tuple) -> Tuple:
+    np_img, alpha_channel, infos = res
+    return (
+        np_img.copy(),
+        alpha_channel.copy() if alpha_channel is not None else None,
+        dict(infos),
+    )
 
 
 def decode_base64_to_image(
+    encoding: str, gray=False, cache: bool = False
+) -> Tuple[np.array, Optional[np.array], Dict]:
+    """
+    cache: cache the decoded result, only for images which will be sent again,
+    e.g: the image being edited. Do not cache masks, they change on every stroke.
+    """
+    if not cache:
+        return _decode_base64_to_image(encoding, gray)
+
+    key = (hashlib.md5(encoding.encode("utf-8")).hexdigest(), gray)
+    with _decode_cache_lock:
+        if key in _decode_cache:
+            _decode_cache.move_to_end(key)
+            # caller may modify the result inplace, always return a copy
+            return _copy_decode_result(_decode_cache[key])
+
+    res = _decode_base64_to_image(encoding, gray)
+
+    nbytes = res[0].nbytes + (res[1].nbytes if res[1] is not None else 0)
+    if nbytes <= DECODE_CACHE_MAX_BYTES:
+        with _decode_cache_lock:
+            _decode_cache[key] = _copy_decode_result(res)
+            total_bytes = sum(
+                it[0].nbytes + (it[1].nbytes if it[1] is not None else 0)
+                for it in _decode_cache.values()
+            )
+            while (
+                len(_decode_cache) > DECODE_CACHE_MAX_ITEMS
+                or total_bytes > DECODE_CACHE_MAX_BYTES
+            ):
+                _, (np_img, alpha_channel, _) = _decode_cache.popitem(last=False)
+                total_bytes -= np_img.nbytes
+                if alpha_channel is not None:
+                    total_bytes -= alpha_channel.nbytes
+    return res
+
+
+def _decode_base64_to_image(
     encoding: str, gray=False
 ) -> Tuple[np.array, Optional[np.array], Dict]:
     if encoding.startswith("data:image/") or encoding.startswith(
         "data:application/octet-stream;base64,"
     ):
         encoding = encoding.split(";")[1].split(",")[1]
-    image = Image.open(io.BytesIO(base64.b64decode(encoding)))
+    img_bytes = base64.b64decode(encoding)
+    image = Image.open(io.BytesIO(img_bytes))
 
     alpha_channel = None
+    np_img = cv2_decode_img(img_bytes, image, gray)
+    if np_img is not None:
+        # no exif rotate info, image.info is the same as exif_transpose result
+        return np_img, alpha_channel, image.info
+
     try:
         image = ImageOps.exif_transpose(image)
     except:
@@ -321,18 +469,7 @@ def decode_base64_to_image(
     # exif_transpose will remove exif rotate info，we must call image.info after exif_transpose
     infos = image.info
 
-    if gray:
-        image = image.convert("L")
-        np_img = np.array(image)
-    else:
-        if image.mode == "RGBA":
-            np_img = np.array(image)
-            alpha_channel = np_img[:, :, -1]
-            np_img = cv2.cvtColor(np_img, cv2.COLOR_RGBA2RGB)
-        else:
-            image = image.convert("RGB")
-            np_img = np.array(image)
-
+    np_img, alpha_channel = pil_decode_img(image, gray)
     return np_img, alpha_channel, infos
 
 
@@ -347,17 +484,27 @@ def encode_pil_to_base64(image: Image, quality: int, infos: Dict) -> bytes:
 
 
 def concat_alpha_channel(rgb_np_img, alpha_channel) -> np.ndarray:
-    if alpha_channel is not None:
+    if alpha_channel is not None and rgb_np_img.shape[2] != 4:
         if alpha_channel.shape[:2] != rgb_np_img.shape[:2]:
             alpha_channel = cv2.resize(
-                alpha_channel, dsize=(rgb_np_img.shape[1], rgb_np_img.shape[0])
+                alpha_channel,
+                dsize=(rgb_np_img.shape[1], rgb_np_img.shape[0]),
+                interpolation=cv2.INTER_NEAREST,
             )
-        rgb_np_img = np.concatenate(
-            (rgb_np_img, alpha_channel[:, :, np.newaxis]), axis=-1
-        )
+        # append channel in one preallocated output(works for BGR too), no temporary arrays
+        rgba_np_img = cv2.cvtColor(rgb_np_img, cv2.COLOR_RGB2RGBA)
+        rgba_np_img[:, :, 3] = alpha_channel
+        return rgba_np_img
     return rgb_np_img
 
 
+def binarize_mask(mask: np.ndarray) -> np.ndarray:
+    """
+    mask > 127 -> 255, else 0. Binarize inplace, mask must be a private copy(e.g: decoded mask)
+    """
+    return cv2.compare(mask, 127, cv2.CMP_GT, dst=mask)
+
+
 def adjust_mask(mask: np.ndarray, kernel_size: int, operate):
     # fronted brush color "ffcc00bb"
     # kernel_size = kernel_size*2+1
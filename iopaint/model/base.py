@@ -115,7 +115,9 @@ class InpaintModel:
                     image, size_limit=config.hd_strategy_resize_limit
                 )
                 downsize_mask = resize_max_size(
-                    mask, size_limit=config.hd_strategy_resize_limit
+                    mask,
+                    size_limit=config.hd_strategy_resize_limit,
+                    interpolation=cv2.INTER_NEAREST,
                 )
 
                 logger.info(
@@ -368,7 +370,9 @@ class DiffusionInpaintModel(InpaintModel):
         longer_side_length = int(config.sd_scale * max(image.shape[:2]))
         origin_size = image.shape[:2]
         downsize_image = resize_max_size(image, size_limit=longer_side_length)
-        downsize_mask = resize_max_size(mask, size_limit=longer_side_length)
+        downsize_mask = resize_max_size(
+            mask, size_limit=longer_side_length, interpolation=cv2.INTER_NEAREST
+        )
         if config.sd_scale != 1:
             logger.info(
                 f"Resize image to do sd inpainting: {image.shape} -> {downsize_image.shape}"
@@ -1681,7 +1681,9 @@ class FcF(InpaintModel):
             crop_image, crop_mask, crop_box = self._crop_box(image, mask, box, config)
             origin_size = crop_image.shape[:2]
             resize_image = resize_max_size(crop_image, size_limit=512)
-            resize_mask = resize_max_size(crop_mask, size_limit=512)
+            resize_mask = resize_max_size(
+                crop_mask, size_limit=512, interpolation=cv2.INTER_NEAREST
+            )
             inpaint_result = self._pad_forward(resize_image, resize_mask, config)
 
             # only paste masked area result
@@ -2,7 +2,6 @@ import os
 
 import cv2
 import numpy as np
-import torch
 
 from iopaint.helper import (
     norm_img,
@@ -12,6 +11,7 @@ from iopaint.helper import (
 )
 from iopaint.schema import InpaintRequest
 from .base import InpaintModel
+from .utils import numpy_to_device
 
 LAMA_MODEL_URL = os.environ.get(
     "LAMA_MODEL_URL",
@@ -46,8 +46,8 @@ class LaMa(InpaintModel):
         mask = norm_img(mask)
 
         mask = (mask > 0) * 1
-        image = torch.from_numpy(image).unsqueeze(0).to(self.device)
-        mask = torch.from_numpy(mask).unsqueeze(0).to(self.device)
+        image = numpy_to_device(image, self.device).unsqueeze(0)
+        mask = numpy_to_device(mask, self.device).unsqueeze(0)
 
         inpainted_image = self.model(image, mask)
 
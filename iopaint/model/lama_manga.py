@@ -12,6 +12,7 @@ from iopaint.helper import (
 )
 from iopaint.schema import InpaintRequest,Config
 from .base import InpaintModel
+from .utils import numpy_to_device
 from loguru import logger
 from PIL import Image
 from iopaint.helper import pil_to_bytes
@@ -61,8 +62,8 @@ class LaMaManga(InpaintModel):
         mask = norm_img(mask)
 
         mask = (mask > 0) * 1
-        image = torch.from_numpy(image).unsqueeze(0).to(self.device)
-        mask = torch.from_numpy(mask).unsqueeze(0).to(self.device)
+        image = numpy_to_device(image, self.device).unsqueeze(0)
+        mask = numpy_to_device(mask, self.device).unsqueeze(0)
 
         inpainted_image = self.model(image, mask)
 
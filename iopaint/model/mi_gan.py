@@ -12,6 +12,7 @@ from iopaint.helper import (
     norm_img,
 )
 from .base import InpaintModel
+from .utils import numpy_to_device
 from iopaint.schema import InpaintRequest
 
 MIGAN_MODEL_URL = os.environ.get(
@@ -56,7 +57,9 @@ class MIGAN(InpaintModel):
             crop_image, crop_mask, crop_box = self._crop_box(image, mask, box, config)
             origin_size = crop_image.shape[:2]
             resize_image = resize_max_size(crop_image, size_limit=512)
-            resize_mask = resize_max_size(crop_mask, size_limit=512)
+            resize_mask = resize_max_size(
+                crop_mask, size_limit=512, interpolation=cv2.INTER_NEAREST
+            )
             inpaint_result = self._pad_forward(resize_image, resize_mask, config)
 
             # only paste masked area result
@@ -92,8 +95,8 @@ class MIGAN(InpaintModel):
         mask = (mask > 120) * 255
         mask = norm_img(mask)
 
-        image = torch.from_numpy(image).unsqueeze(0).to(self.device)
-        mask = torch.from_numpy(mask).unsqueeze(0).to(self.device)
+        image = numpy_to_device(image, self.device).unsqueeze(0)
+        mask = numpy_to_device(mask, self.device).unsqueeze(0)
 
         erased_img = image * (1 - mask)
         input_image = torch.cat([0.5 - mask, erased_img], dim=1)
@@ -50,7 +50,7 @@ class PaintByExample(DiffusionInpaintModel):
         if config.paint_by_example_example_image is None:
             raise ValueError("paint_by_example_example_image is required")
         example_image, _, _ = decode_base64_to_image(
-            config.paint_by_example_example_image
+            config.paint_by_example_example_image, cache=True
         )
         output = self.model(
             image=PIL.Image.fromarray(image),
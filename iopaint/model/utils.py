@@ -1031,3 +1031,92 @@ def enable_low_mem(pipe, enable: bool):
 
     if enable:
         pipe.vae.enable_tiling()
+
+
+class CUDAGraphModule:
+    """
+    Capture module forward into CUDA graph for each input shape and replay it,
+    which removes the kernel launch overhead. Only support positional cuda tensor args,
+    other calls fallback to the original module.
+    """
+
+    def __init__(self, module: torch.nn.Module, max_graphs: int = 4):
+        self.module = module
+        self.max_graphs = max_graphs
+        self._graph_cache = collections.OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def __call__(self, *args, **kwargs):
+        if kwargs or not all(
+            isinstance(it, torch.Tensor) and it.is_cuda for it in args
+        ):
+            return self.module(*args, **kwargs)
+
+        key = tuple((it.shape, it.dtype) for it in args)
+        if key in self._graph_cache:
+            self._graph_cache.move_to_end(key)
+        else:
+            if len(self._graph_cache) >= self.max_graphs:
+                self._graph_cache.popitem(last=False)
+            logger.info(f"Capture CUDA graph for input shapes: {[it[0] for it in key]}")
+            self._graph_cache[key] = self._capture(args)
+
+        graph, static_inputs, static_output = self._graph_cache[key]
+        for static_input, it in zip(static_inputs, args):
+            static_input.copy_(it)
+        graph.replay()
+
+        # static_output will be overwritten by next replay
+        if isinstance(static_output, torch.Tensor):
+            return static_output.clone()
+        return type(static_output)(it.clone() for it in static_output)
+
+    def _capture(self, args):
+        static_inputs = [it.clone() for it in args]
+
+        # warmup on side stream before capture
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(3):
+                self.module(*static_inputs)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_output = self.module(*static_inputs)
+        return graph, static_inputs, static_output
+
+
+# Reusable pinned host buffers for host to device copy, key: (shape, dtype)
+PINNED_BUFFERS_MAX_ITEMS = 8
+_pinned_buffers = collections.OrderedDict()
+
+
+def numpy_to_device(np_array: np.ndarray, device) -> torch.Tensor:
+    """
+    Copy numpy array to device. On cuda, copy through a reusable pinned memory buffer,
+    host to device copy from pinned memory is about 2x faster than pageable memory.
+    """
+    tensor = torch.from_numpy(np_array)
+    if torch.device(device).type != "cuda":
+        return tensor.to(device)
+
+    key = (np_array.shape, np_array.dtype.str)
+    if key in _pinned_buffers:
+        buffer, copy_done = _pinned_buffers.pop(key)
+        # wait previous non_blocking copy finished before overwriting the buffer
+        copy_done.synchronize()
+    else:
+        buffer, copy_done = torch.empty_like(tensor, pin_memory=True), torch.cuda.Event()
+
+    buffer.copy_(tensor)
+    res = buffer.to(device, non_blocking=True)
+    copy_done.record()
+
+    _pinned_buffers[key] = (buffer, copy_done)
+    while len(_pinned_buffers) > PINNED_BUFFERS_MAX_ITEMS:
+        _pinned_buffers.popitem(last=False)
+    return res
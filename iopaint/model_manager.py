@@ -4,10 +4,12 @@ import torch
 from loguru import logger
 import numpy as np
 
+from iopaint.const import AUTOCAST_UNSUPPORT_MODELS, CUDA_GRAPH_SUPPORT_MODELS
 from iopaint.download import scan_models
 from iopaint.helper import switch_mps_device
 from iopaint.model import models, ControlNet, SD, SDXL
-from iopaint.model.utils import torch_gc, is_local_files_only
+from iopaint.model.base import InpaintModel, DiffusionInpaintModel
+from iopaint.model.utils import torch_gc, is_local_files_only, CUDAGraphModule
 from iopaint.schema import InpaintRequest, ModelInfo, ModelType
 
 
@@ -50,23 +52,92 @@ class ModelManager:
         }
 
         if model_info.support_controlnet and self.enable_controlnet:
-            return ControlNet(device, **kwargs)
+            model = ControlNet(device, **kwargs)
         elif model_info.name in models:
-            return models[name](device, **kwargs)
+            model = models[name](device, **kwargs)
+        elif model_info.model_type in [
+            ModelType.DIFFUSERS_SD_INPAINT,
+            ModelType.DIFFUSERS_SD,
+        ]:
+            model = SD(device, **kwargs)
+        elif model_info.model_type in [
+            ModelType.DIFFUSERS_SDXL_INPAINT,
+            ModelType.DIFFUSERS_SDXL,
+        ]:
+            model = SDXL(device, **kwargs)
         else:
-            if model_info.model_type in [
-                ModelType.DIFFUSERS_SD_INPAINT,
-                ModelType.DIFFUSERS_SD,
-            ]:
-                return SD(device, **kwargs)
+            raise NotImplementedError(f"Unsupported model: {name}")
 
-            if model_info.model_type in [
-                ModelType.DIFFUSERS_SDXL_INPAINT,
-                ModelType.DIFFUSERS_SDXL,
-            ]:
-                return SDXL(device, **kwargs)
+        self.enable_channels_last(model)
+        if kwargs.get("torch_compile", False):
+            self.compile_model(model, **kwargs)
+        if kwargs.get("cuda_graph", False):
+            self.enable_cuda_graph(model)
+        return model
 
-        raise NotImplementedError(f"Unsupported model: {name}")
+    def enable_channels_last(self, model: InpaintModel):
+        # cuDNN has faster NHWC(channels_last) kernels for conv UNet, especially with fp16 tensor cores
+        if not isinstance(model, DiffusionInpaintModel):
+            return
+        if torch.device(model.device).type != "cuda":
+            return
+        if hasattr(model.model, "unet"):
+            model.model.unet.to(memory_format=torch.channels_last)
+
+    def compile_model(self, model: InpaintModel, **kwargs):
+        if torch.device(model.device).type != "cuda":
+            logger.warning(f"torch.compile only enabled on cuda, skip {model.name}")
+            return
+        if kwargs.get("cpu_offload", False):
+            logger.warning("torch.compile not work with --cpu-offload, skip")
+            return
+
+        if isinstance(model, DiffusionInpaintModel):
+            # unet may be reused from a compiled pipeline when enable/disable controlnet
+            if hasattr(model.model, "unet") and not hasattr(
+                model.model.unet, "_orig_mod"
+            ):
+                logger.info(f"torch.compile {model.name} unet")
+                model.model.unet = torch.compile(
+                    model.model.unet, mode="reduce-overhead", fullgraph=False
+                )
+            return
+
+        # zits/manga/cv2 do not have a single nn.Module in model.model
+        module = getattr(model, "model", None)
+        if not isinstance(module, torch.nn.Module) or isinstance(
+            module, torch.jit.ScriptModule
+        ):
+            logger.warning(f"torch.compile not support {model.name}, skip")
+            return
+
+        logger.info(f"torch.compile {model.name}, warm up with 512x512 image")
+        model.model = torch.compile(module, mode="reduce-overhead", fullgraph=False)
+        with torch.inference_mode():
+            model(
+                np.zeros((512, 512, 3), dtype=np.uint8),
+                np.zeros((512, 512), dtype=np.uint8),
+                InpaintRequest(),
+            )
+
+    def enable_cuda_graph(self, model: InpaintModel):
+        # only models whose forward call self.model(*tensors) can replay the graph
+        if model.name not in CUDA_GRAPH_SUPPORT_MODELS:
+            logger.warning(f"CUDA graph not support {model.name}, skip")
+            return
+        if torch.device(model.device).type != "cuda":
+            logger.warning(f"CUDA graph only enabled on cuda, skip {model.name}")
+            return
+        module = getattr(model, "model", None)
+        if not isinstance(module, torch.nn.Module):
+            logger.warning(f"CUDA graph not support {model.name}, skip")
+            return
+        # torch.compile(mode="reduce-overhead") already use CUDA graph
+        if hasattr(module, "_orig_mod"):
+            return
+
+        logger.info(f"Enable CUDA graph for {model.name}")
+        model.model = CUDAGraphModule(module)
 
     @torch.inference_mode()
     def __call__(self, image, mask, config: InpaintRequest):
@@ -83,7 +154,29 @@ class ModelManager:
         self.switch_controlnet_method(config)
         self.enable_disable_freeu(config)
         self.enable_disable_lcm_lora(config)
-        return self.model(image, mask, config).astype(np.uint8)
+        # CUDA graph capture must not read autocast cached weights, they are freed
+        # when autocast block exits, graph replay would read freed memory
+        with torch.autocast(
+            device_type="cuda",
+            dtype=torch.float16,
+            enabled=self.enable_autocast,
+            cache_enabled=not self.kwargs.get("cuda_graph", False),
+        ):
+            res = self.model(image, mask, config)
+        if res.dtype != np.uint8:
+            res = np.clip(res, 0, 255).astype(np.uint8)
+        return res
+
+    @property
+    def enable_autocast(self) -> bool:
+        # diffusion pipelines are already loaded in fp16, autocast would override
+        # the fp32 upcast(e.g: sdxl vae) they rely on
+        return (
+            not isinstance(self.model, DiffusionInpaintModel)
+            and not self.kwargs.get("no_half", False)
+            and torch.device(self.model.device).type == "cuda"
+            and self.name not in AUTOCAST_UNSUPPORT_MODELS
+        )
 
     def scan_models(self) -> List[ModelInfo]:
         available_models = scan_models()
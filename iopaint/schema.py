@@ -223,6 +223,8 @@ class ApiConfig(BaseModel):
     model: str
     no_half: bool
     low_mem: bool
+    torch_compile: bool = False
+    cuda_graph: bool = False
     cpu_offload: bool
     disable_nsfw_checker: bool
     local_files_only: bool
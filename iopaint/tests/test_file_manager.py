@@ -0,0 +1,35 @@
+import shutil
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from iopaint.file_manager import FileManager
+from iopaint.tests.utils import current_dir
+
+
+def test_media_thumbnail_file_etag(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    shutil.copy(current_dir / "image.png", input_dir / "image.png")
+
+    app = FastAPI()
+    FileManager(app, input_dir=input_dir, output_dir=tmp_path / "output")
+    client = TestClient(app)
+
+    url = "/api/v1/media_thumbnail_file"
+    params = {"tab": "input", "filename": "image.png", "width": 128, "height": 0}
+    res = client.get(url, params=params)
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    assert res.headers["Cache-Control"] == "max-age=86400"
+
+    for if_none_match in [etag, f"W/{etag}", f'"other", {etag}']:
+        res = client.get(url, params=params, headers={"If-None-Match": if_none_match})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["ETag"] == etag
+        assert res.headers["Cache-Control"] == "max-age=86400"
+
+    res = client.get(url, params=params, headers={"If-None-Match": '"other"'})
+    assert res.status_code == 200
+    assert res.headers["ETag"] == etag
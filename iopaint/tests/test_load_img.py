@@ -1,4 +1,18 @@
-from iopaint.helper import load_img
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from iopaint.helper import (
+    load_img,
+    cv2_decode_img,
+    pil_decode_img,
+    decode_base64_to_image,
+    get_image_ext,
+    pil_to_bytes,
+)
 from iopaint.tests.utils import current_dir
 
 png_img_p = current_dir / "image.png"
@@ -17,3 +31,49 @@ def test_load_jpg_image():
         np_img, alpha_channel = load_img(f.read())
     assert np_img.shape == (394, 448, 3)
     assert alpha_channel is None
+
+
+def test_load_gray_image():
+    with open(png_img_p, "rb") as f:
+        np_img, alpha_channel = load_img(f.read(), gray=True)
+    assert np_img.shape == (256, 256)
+    assert alpha_channel is None
+
+
+def test_cv2_decode_same_as_pil():
+    img_bytes = (current_dir / "overture-creations-5sI6fQgYIuo.png").read_bytes()
+    image = Image.open(io.BytesIO(img_bytes))
+    cv2_np_img = cv2_decode_img(img_bytes, image)
+    pil_np_img, _ = pil_decode_img(image)
+    assert np.array_equal(cv2_np_img, pil_np_img)
+
+
+@pytest.mark.parametrize(
+    "name", ["cat.png", "overture-creations-5sI6fQgYIuo_mask.png", "bunny.jpeg"]
+)
+def test_cv2_gray_decode_same_as_pil(name):
+    img_bytes = (current_dir / name).read_bytes()
+    l_img_bytes = pil_to_bytes(Image.open(io.BytesIO(img_bytes)).convert("L"), "png")
+    # RGB/RGBA source and L mode source
+    for it in [img_bytes, l_img_bytes]:
+        np_img, _ = load_img(it, gray=True)
+        pil_np_img, _ = pil_decode_img(Image.open(io.BytesIO(it)), gray=True)
+        assert np.array_equal(np_img, pil_np_img)
+
+
+def test_decode_base64_to_image_cache():
+    encoding = base64.b64encode(jpg_img_p.read_bytes()).decode("utf-8")
+    np_img, _, _ = decode_base64_to_image(encoding, cache=True)
+    origin_np_img = np_img.copy()
+    np_img[:] = 0
+
+    cached_np_img, alpha_channel, _ = decode_base64_to_image(encoding, cache=True)
+    assert np.array_equal(cached_np_img, origin_np_img)
+    assert alpha_channel is None
+
+
+def test_get_image_ext():
+    assert get_image_ext(png_img_p.read_bytes()) == "png"
+    assert get_image_ext(jpg_img_p.read_bytes()) == "jpeg"
+    assert get_image_ext(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert get_image_ext(b"unknown") == "jpeg"
@@ -3,9 +3,11 @@ import tempfile
 from pathlib import Path
 from typing import List
 
+import cv2
+import numpy as np
 from PIL import Image
 
-from iopaint.helper import pil_to_bytes, load_img
+from iopaint.helper import pil_to_bytes, load_img, bgr_np_img_to_bytes
 
 current_dir = Path(__file__).parent.absolute().resolve()
 
@@ -57,3 +59,28 @@ def test_jpeg():
 def test_png_parameter():
     jpg_img_p = current_dir / "png_parameter_test.png"
     run_test(jpg_img_p, ["parameters"])
+
+
+def test_bgr_np_img_to_bytes():
+    img_bytes = (current_dir / "image.png").read_bytes()
+    np_img, alpha_channel = load_img(img_bytes)
+    rgba_np_img = np.concatenate((np_img, alpha_channel[:, :, np.newaxis]), axis=-1)
+    bgra_np_img = cv2.cvtColor(rgba_np_img, cv2.COLOR_RGBA2BGRA)
+    res_img = Image.open(io.BytesIO(bgr_np_img_to_bytes(bgra_np_img, ext="png")))
+    assert np.array_equal(np.array(res_img), rgba_np_img)
+
+    img_bytes = (current_dir / "png_parameter_test.png").read_bytes()
+    np_img, _, infos = load_img(img_bytes, return_info=True)
+    bgr_np_img = cv2.cvtColor(np_img, cv2.COLOR_RGB2BGR)
+    res_img = Image.open(
+        io.BytesIO(bgr_np_img_to_bytes(bgr_np_img, "png", infos=infos))
+    )
+    assert_keys(["parameters"], infos, res_img.info)
+
+    dpi_bytes = pil_to_bytes(Image.fromarray(np_img), "png", infos={"dpi": (300, 300)})
+    np_img, _, infos = load_img(dpi_bytes, return_info=True)
+    bgr_np_img = cv2.cvtColor(np_img, cv2.COLOR_RGB2BGR)
+    res_img = Image.open(
+        io.BytesIO(bgr_np_img_to_bytes(bgr_np_img, "png", infos=infos))
+    )
+    assert_keys(["dpi"], infos, res_img.info)
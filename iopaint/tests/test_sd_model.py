@@ -267,3 +267,21 @@ def test_local_file_path(device, sampler, name):
         fx=1.5 if is_sdxl else 1,
         fy=1.5 if is_sdxl else 1,
     )
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "runwayml/stable-diffusion-inpainting",
+        "diffusers/stable-diffusion-xl-1.0-inpainting-0.1",
+    ],
+)
+def test_diffusion_model_disable_autocast(name):
+    check_device("cuda")
+    model = ModelManager(
+        name=name,
+        device=torch.device("cuda"),
+        disable_nsfw=True,
+        sd_cpu_textencoder=False,
+    )
+    assert not model.enable_autocast
@@ -31,6 +31,8 @@ default_configs = dict(
     model_dir=DEFAULT_MODEL_DIR,
     no_half=False,
     low_mem=False,
+    torch_compile=False,
+    cuda_graph=False,
     cpu_offload=False,
     disable_nsfw_checker=False,
     local_files_only=False,